@@ -6,6 +6,8 @@ import logging
 import config
 import os
 import sys
+import time
+import importlib
 import asyncio
 
 # ---------------------------
@@ -39,6 +41,9 @@ bot = commands.Bot(command_prefix='!', intents=intents)
 # Remove the default help command to implement a custom one if needed
 bot.remove_command('help')
 
+# State exported by cogs during !reload, keyed by cog name and consumed by the new instance
+bot.cog_state_handoff = {}
+
 # ---------------------------
 # Load Cogs Asynchronously
 # ---------------------------
@@ -48,7 +53,11 @@ async def load_extensions():
         'cogs.assignment_management',
         'cogs.payment_handling',
         'cogs.communication',
-        'cogs.feedback'
+        'cogs.feedback',
+        'cogs.archival',
+        'cogs.search',
+        'cogs.duplicate_detection',
+        'cogs.profiling'
     ]
     for extension in initial_extensions:
         try:
@@ -79,22 +88,87 @@ async def on_command_error(ctx, error):
     if isinstance(error, commands.CommandNotFound):
         await ctx.send("⚠️ Command not found. Please use `!help` to see all available commands.")
     elif isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send("⚠️ Missing arguments. Please check the command usage.")
+        await ctx.send("⚠️ Missing arguments. Please check the command usage.", ephemeral=True)
+    elif isinstance(error, commands.NoPrivateMessage):
+        await ctx.send("⚠️ This command can only be used in the server.", ephemeral=True)
     elif isinstance(error, commands.CheckFailure):
-        await ctx.send("⚠️ You do not have permission to use this command.")
+        await ctx.send("⚠️ You do not have permission to use this command.", ephemeral=True)
     else:
-        await ctx.send("⚠️ An unexpected error occurred. Please contact the admin.")
+        await ctx.send("⚠️ An unexpected error occurred. Please contact the admin.", ephemeral=True)
         logging.error(f'Unhandled exception in command {ctx.command}:', exc_info=True)
 
 @bot.event
 async def on_member_join(member):
     """
     Event handler for when a new member joins the server.
-    Sends a welcome message if needed.
+    Welcome DMs are queued and rate limited by the Communication cog.
     """
     logging.info(f'New member joined: {member.name} (ID: {member.id})')
 
-    # You can send a welcome message or assign roles here if needed
+    # You can assign roles here if needed
+
+# ---------------------------
+# Admin Commands
+# ---------------------------
+
+async def reload_extension_with_state(extension):
+    """
+    Reloads an extension, handing the live state and timers of its cogs over to the new instances.
+    """
+    for name, loaded_cog in bot.cogs.items():
+        if loaded_cog.__module__ == extension and hasattr(loaded_cog, 'export_state'):
+            bot.cog_state_handoff[name] = loaded_cog.export_state()
+
+    try:
+        await bot.reload_extension(extension)
+    finally:
+        bot.cog_state_handoff.clear()
+
+@bot.command(name='reload')
+@commands.has_permissions(manage_guild=True)
+async def reload(ctx, cog: str):
+    """
+    Admin command to hot reload a cog without restarting the bot, keeping its live state.
+    Reloading a cog does not pick up changes to cogs/utilities.py; use `!reload utilities`
+    to reload the shared helpers together with every loaded cog.
+    Usage: !reload assignment_management
+    """
+    extension = cog if cog.startswith('cogs.') else f'cogs.{cog}'
+    started = time.perf_counter()
+
+    if extension == 'cogs.utilities':
+        # Cogs bind the helpers at import time, so every cog has to be reloaded after the module
+        extensions = [name for name in bot.extensions if name.startswith('cogs.')]
+    elif extension in bot.extensions:
+        extensions = [extension]
+    else:
+        await ctx.send(f"⚠️ Extension `{extension}` is not loaded.")
+        return
+
+    try:
+        if extension == 'cogs.utilities':
+            importlib.reload(sys.modules['cogs.utilities'])
+        for name in extensions:
+            await reload_extension_with_state(name)
+    except Exception:
+        logging.error(f'Failed to reload {extension}.', exc_info=True)
+        await ctx.send(f"❌ Failed to reload `{extension}`. Extensions that failed keep running their previous version.")
+        return
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logging.info(f'Reloaded {extension} ({len(extensions)} extensions) in {elapsed_ms:.0f} ms')
+    await ctx.send(f"♻️ Reloaded `{extension}` in {elapsed_ms:.0f} ms.")
+
+@bot.command(name='sync')
+@commands.has_permissions(manage_guild=True)
+async def sync(ctx):
+    """
+    Admin command to register the slash commands with Discord after they change.
+    Usage: !sync
+    """
+    synced = await bot.tree.sync()
+    logging.info(f'Synced {len(synced)} application commands')
+    await ctx.send(f"✅ Synced {len(synced)} slash commands.")
 
 # ---------------------------
 # Main Function to Run the Bot
@@ -0,0 +1,202 @@
+# cogs/archival.py
+
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from .utilities import notify_admins
+import config
+
+TRANSCRIPTS_DIR = getattr(config, 'TRANSCRIPTS_DIR', 'data/transcripts')
+ARCHIVE_BATCH_SIZE = getattr(config, 'ARCHIVE_BATCH_SIZE', 10)  # Channels archived per sweep
+ARCHIVE_IDLE_DAYS = getattr(config, 'ARCHIVE_IDLE_DAYS', 14)  # Days without activity before a channel is swept
+ARCHIVE_UNTRACKED_CHANNELS = getattr(config, 'ARCHIVE_UNTRACKED_CHANNELS', False)  # Also sweep channels with no tracked assignment
+HISTORY_PAGE_SIZE = 100  # Maximum messages returned per history request
+
+class Archival(commands.Cog):
+    """Cog for archiving assignment channel transcripts before the channels are deleted."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.index_path = os.path.join(TRANSCRIPTS_DIR, 'index.json')
+        self.index_lock = asyncio.Lock()
+        self.index = {}  # {assignment_id: transcript metadata}
+
+        if not os.path.exists(TRANSCRIPTS_DIR):
+            os.makedirs(TRANSCRIPTS_DIR)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding='utf-8') as f:
+                self.index = json.load(f)
+
+        # Restore state handed over by a previous instance during !reload
+        state = self.bot.cog_state_handoff.get('Archival')
+        self.sweep_resume_at = state['sweep_resume_at'] if state else None
+
+        self.archive_idle_channels.start()  # Start the idle channel sweep
+
+    def cog_unload(self):
+        self.archive_idle_channels.cancel()
+
+    def export_state(self):
+        """Returns the live state to hand over to the reloaded instance."""
+        # next_iteration is None while before_loop is still waiting for a handed-over schedule
+        return {'sweep_resume_at': self.archive_idle_channels.next_iteration or self.sweep_resume_at}
+
+    async def archive_channel(self, channel, assignment_id):
+        """
+        Streams the full history of a channel into a compressed transcript file
+        and records it in the transcript index. Returns the number of archived messages.
+        """
+        path = os.path.join(TRANSCRIPTS_DIR, f"{assignment_id}.jsonl.gz")
+        tmp_path = f"{path}.tmp"
+        message_count = 0
+        attachment_count = 0
+        batch = []
+        contents = []
+
+        transcript = await asyncio.to_thread(gzip.open, tmp_path, 'wt', encoding='utf-8')
+        try:
+            # history() pages through the channel HISTORY_PAGE_SIZE messages per request
+            async for message in channel.history(limit=None, oldest_first=True):
+                attachments = [
+                    {'filename': a.filename, 'url': a.url, 'size': a.size}
+                    for a in message.attachments
+                ]
+                batch.append(json.dumps({
+                    'id': message.id,
+                    'author_id': message.author.id,
+                    'author': str(message.author),
+                    'created_at': message.created_at.isoformat(),
+                    'content': message.content,
+                    'attachments': attachments,
+                }) + '\n')
+                if message.content:
+                    contents.append(message.content)
+                message_count += 1
+                attachment_count += len(attachments)
+
+                if len(batch) >= HISTORY_PAGE_SIZE:
+                    await asyncio.to_thread(transcript.writelines, batch)
+                    batch = []
+
+            if batch:
+                await asyncio.to_thread(transcript.writelines, batch)
+            await asyncio.to_thread(transcript.close)
+        except BaseException:
+            # Don't leave a partial transcript behind when paging or writing fails
+            try:
+                transcript.close()
+            except OSError:
+                pass
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        os.replace(tmp_path, path)
+
+        async with self.index_lock:
+            self.index[assignment_id] = {
+                'path': path,
+                'channel_id': channel.id,
+                'channel_name': channel.name,
+                'messages': message_count,
+                'attachments': attachment_count,
+                'archived_at': datetime.utcnow().isoformat(),
+            }
+            await asyncio.to_thread(self._write_index, dict(self.index))
+
+        search_cog = self.bot.get_cog('Search')
+        if search_cog and contents:
+            search_cog.index_document(assignment_id, 'transcript', '\n'.join(contents), replace=True)
+
+        logging.info(f'Archived {message_count} messages from #{channel.name} to {path}')
+        return message_count
+
+    def _write_index(self, index):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    @commands.command(name='archive_assignment')
+    @commands.has_permissions(manage_guild=True)
+    async def archive_assignment(self, ctx):
+        """
+        Admin command to archive the current assignment channel transcript without closing it.
+        Usage: !archive_assignment
+        """
+        if not ctx.channel.name.startswith('assignment-'):
+            await ctx.send("⚠️ This command can only be used in an assignment channel.")
+            return
+
+        assignment_id = ctx.channel.name.replace('assignment-', '')
+        message_count = await self.archive_channel(ctx.channel, assignment_id)
+        await ctx.send(f"🗄️ Archived {message_count} messages for Assignment {assignment_id}.")
+
+    @tasks.loop(hours=1)
+    async def archive_idle_channels(self):
+        """Task that archives and deletes a batch of idle assignment channels to stay under the guild channel cap."""
+
+        assignment_cog = self.bot.get_cog('AssignmentManagement')
+        cutoff = datetime.now(timezone.utc) - timedelta(days=ARCHIVE_IDLE_DAYS)
+        archived = 0
+
+        for guild in self.bot.guilds:
+            category = discord.utils.get(guild.categories, name="Assignments")
+            if category is None:
+                continue
+
+            for channel in category.text_channels:
+                if archived >= ARCHIVE_BATCH_SIZE:
+                    return
+                if not channel.name.startswith('assignment-'):
+                    continue
+
+                # Never sweep channels for assignments that are still being worked on. Assignment
+                # data only lives in memory, so untracked channels are skipped unless opted in.
+                assignment = assignment_cog.assignments.get(channel.id) if assignment_cog else None
+                if assignment is None and not ARCHIVE_UNTRACKED_CHANNELS:
+                    continue
+                if assignment and assignment['status'] not in ('Delivered', 'Rejected'):
+                    continue
+
+                if channel.last_message_id:
+                    last_activity = discord.utils.snowflake_time(channel.last_message_id)
+                else:
+                    last_activity = channel.created_at
+                if last_activity > cutoff:
+                    continue
+
+                assignment_id = channel.name.replace('assignment-', '')
+                try:
+                    await self.archive_channel(channel, assignment_id)
+                    await channel.delete(reason="Archived idle assignment channel")
+                except (discord.HTTPException, OSError):
+                    logging.error(f'Failed to archive idle channel #{channel.name}.', exc_info=True)
+                    continue
+
+                if assignment is None:
+                    logging.warning(f'Archived and deleted untracked idle channel #{channel.name}.')
+                    await notify_admins(
+                        self.bot,
+                        f"🗄️ Archived and deleted idle channel #{channel.name} (Assignment {assignment_id}), "
+                        f"which had no tracked assignment. The transcript is kept in {TRANSCRIPTS_DIR}."
+                    )
+
+                if assignment_cog:
+                    assignment_cog.assignments.pop(channel.id, None)
+                archived += 1
+
+    @archive_idle_channels.before_loop
+    async def before_archive_idle_channels(self):
+        await self.bot.wait_until_ready()
+        if self.sweep_resume_at:
+            # Keep the previous instance's schedule instead of sweeping immediately after a reload
+            await discord.utils.sleep_until(self.sweep_resume_at)
+
+async def setup(bot):
+    await bot.add_cog(Archival(bot))
@@ -1,11 +1,12 @@
 # cogs/assignment_management.py
 
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 import asyncio
 import uuid
 from datetime import datetime, timedelta
-from .utilities import generate_unique_id, format_message, validate_input
+from .utilities import generate_unique_id, format_message, validate_input, notify_admins
 import config
 
 class AssignmentManagement(commands.Cog):
@@ -14,12 +15,29 @@ class AssignmentManagement(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.assignments = {}  # Stores assignment data
+        self.reminder_resume_at = None
+
+        # Restore state handed over by a previous instance during !reload
+        state = self.bot.cog_state_handoff.get('AssignmentManagement')
+        if state:
+            self.assignments = state['assignments']
+            self.reminder_resume_at = state['reminder_resume_at']
+
         self.deadline_reminder.start()  # Start the deadline reminder task
 
     def cog_unload(self):
         self.deadline_reminder.cancel()
 
-    @commands.command(name='upload_assignment')
+    def export_state(self):
+        """Returns the live state to hand over to the reloaded instance."""
+        return {
+            'assignments': self.assignments,
+            # next_iteration is None while before_loop is still waiting for a handed-over schedule
+            'reminder_resume_at': self.deadline_reminder.next_iteration or self.reminder_resume_at,
+        }
+
+    @commands.hybrid_command(name='upload_assignment')
+    @commands.guild_only()
     async def upload_assignment(self, ctx):
         """
         Command for students to initiate an assignment submission.
@@ -28,9 +46,12 @@ class AssignmentManagement(commands.Cog):
 
         # Check if the command is used in the designated channel
         if ctx.channel.id != config.UPLOAD_ASSIGNMENT_CHANNEL_ID:
-            await ctx.send(f"Please use this command in the <#{config.UPLOAD_ASSIGNMENT_CHANNEL_ID}> channel.")
+            await ctx.send(f"Please use this command in the <#{config.UPLOAD_ASSIGNMENT_CHANNEL_ID}> channel.", ephemeral=True)
             return
 
+        # Creating the category and channel can outlast the interaction window
+        await ctx.defer(ephemeral=True)
+
         student = ctx.author
         guild = ctx.guild
 
@@ -68,7 +89,8 @@ class AssignmentManagement(commands.Cog):
 
         # Notify the student
         await ctx.send(
-            f"✅ A private channel has been created for your assignment: {assignment_channel.mention}"
+            f"✅ A private channel has been created for your assignment: {assignment_channel.mention}",
+            ephemeral=True
         )
 
         # Send initial messages in the private channel
@@ -91,15 +113,15 @@ class AssignmentManagement(commands.Cog):
         }
 
         # Send a reminder to admin to review the assignment
-        for admin_id in config.ADMIN_IDS:
-            admin_user = self.bot.get_user(admin_id)
-            if admin_user:
-                await admin_user.send(
-                    f"📥 New assignment submitted by {student.mention} in {assignment_channel.mention}."
-                )
+        await notify_admins(
+            self.bot,
+            f"📥 New assignment submitted by {student.mention} in {assignment_channel.mention}."
+        )
 
-    @commands.command(name='confirm_assignment')
+    @commands.hybrid_command(name='confirm_assignment')
+    @commands.guild_only()
     @commands.has_permissions(manage_guild=True)
+    @app_commands.describe(doable="Whether the assignment can be accepted")
     async def confirm_assignment(self, ctx, doable: bool):
         """
         Admin command to confirm if the assignment is doable.
@@ -109,7 +131,7 @@ class AssignmentManagement(commands.Cog):
         # Check if the command is used in an assignment channel
         assignment = self.assignments.get(ctx.channel.id)
         if not assignment:
-            await ctx.send("This command can only be used in an assignment channel.")
+            await ctx.send("This command can only be used in an assignment channel.", ephemeral=True)
             return
 
         assignment['reviewed'] = True
@@ -150,11 +172,14 @@ class AssignmentManagement(commands.Cog):
             # Optionally delete or archive the channel
             await ctx.send("This channel will be deleted in 1 minute.")
             await asyncio.sleep(60)
+            await self._archive_transcript(ctx.channel, assignment)
             await ctx.channel.delete()
             del self.assignments[ctx.channel.id]
 
-    @commands.command(name='set_deadline')
-    async def set_deadline(self, ctx, *, deadline_str):
+    @commands.hybrid_command(name='set_deadline')
+    @commands.guild_only()
+    @app_commands.describe(deadline_str="Deadline as YYYY-MM-DD HH:MM (24-hour format)")
+    async def set_deadline(self, ctx, *, deadline_str: str):
         """
         Command for the student to set the assignment deadline.
         Usage: !set_deadline YYYY-MM-DD HH:MM (24-hour format)
@@ -162,22 +187,22 @@ class AssignmentManagement(commands.Cog):
         # Check if the command is used in an assignment channel
         assignment = self.assignments.get(ctx.channel.id)
         if not assignment:
-            await ctx.send("This command can only be used in your assignment channel.")
+            await ctx.send("This command can only be used in your assignment channel.", ephemeral=True)
             return
 
         student = assignment['student']
         if ctx.author != student:
-            await ctx.send("Only the assignment owner can set the deadline.")
+            await ctx.send("Only the assignment owner can set the deadline.", ephemeral=True)
             return
 
         # Validate deadline
         try:
             deadline = datetime.strptime(deadline_str, "%Y-%m-%d %H:%M")
             if deadline < datetime.now():
-                await ctx.send("The deadline cannot be in the past.")
+                await ctx.send("The deadline cannot be in the past.", ephemeral=True)
                 return
         except ValueError:
-            await ctx.send("Please enter the deadline in the format: YYYY-MM-DD HH:MM")
+            await ctx.send("Please enter the deadline in the format: YYYY-MM-DD HH:MM", ephemeral=True)
             return
 
         assignment['deadline'] = deadline
@@ -186,15 +211,14 @@ class AssignmentManagement(commands.Cog):
         await ctx.send(f"⏰ Deadline has been set to: {deadline.strftime('%Y-%m-%d %H:%M')}")
 
         # Notify admin
-        for admin_id in config.ADMIN_IDS:
-            admin_user = self.bot.get_user(admin_id)
-            if admin_user:
-                await admin_user.send(
-                    f"📅 Deadline for assignment {assignment['assignment_id']} in {ctx.channel.mention} "
-                    f"has been set to: {deadline.strftime('%Y-%m-%d %H:%M')}"
-                )
-
-    @commands.command(name='deliver_assignment')
+        await notify_admins(
+            self.bot,
+            f"📅 Deadline for assignment {assignment['assignment_id']} in {ctx.channel.mention} "
+            f"has been set to: {deadline.strftime('%Y-%m-%d %H:%M')}"
+        )
+
+    @commands.hybrid_command(name='deliver_assignment')
+    @commands.guild_only()
     @commands.has_permissions(manage_guild=True)
     async def deliver_assignment(self, ctx):
         """
@@ -205,7 +229,7 @@ class AssignmentManagement(commands.Cog):
         # Check if the command is used in an assignment channel
         assignment = self.assignments.get(ctx.channel.id)
         if not assignment:
-            await ctx.send("This command can only be used in an assignment channel.")
+            await ctx.send("This command can only be used in an assignment channel.", ephemeral=True)
             return
 
         assignment['status'] = 'Delivered'
@@ -222,8 +246,10 @@ class AssignmentManagement(commands.Cog):
             "Please review it and let us know if any revisions are needed."
         )
 
-    @commands.command(name='request_revision')
-    async def request_revision(self, ctx, *, revision_details):
+    @commands.hybrid_command(name='request_revision')
+    @commands.guild_only()
+    @app_commands.describe(revision_details="Details of the revision needed")
+    async def request_revision(self, ctx, *, revision_details: str):
         """
         Command for the student to request a revision.
         Usage: !request_revision Details of the revision needed
@@ -232,12 +258,12 @@ class AssignmentManagement(commands.Cog):
         # Check if the command is used in an assignment channel
         assignment = self.assignments.get(ctx.channel.id)
         if not assignment:
-            await ctx.send("This command can only be used in your assignment channel.")
+            await ctx.send("This command can only be used in your assignment channel.", ephemeral=True)
             return
 
         student = assignment['student']
         if ctx.author != student:
-            await ctx.send("Only the assignment owner can request a revision.")
+            await ctx.send("Only the assignment owner can request a revision.", ephemeral=True)
             return
 
         assignment['status'] = 'Revision Requested'
@@ -246,18 +272,21 @@ class AssignmentManagement(commands.Cog):
             'timestamp': datetime.now()
         })
 
-        await ctx.send("🔄 Your revision request has been received. We will work on it promptly.")
+        search_cog = self.bot.get_cog('Search')
+        if search_cog:
+            search_cog.index_document(assignment['assignment_id'], 'revision', revision_details)
+
+        await ctx.send("🔄 Your revision request has been received. We will work on it promptly.", ephemeral=True)
 
         # Notify admin
-        for admin_id in config.ADMIN_IDS:
-            admin_user = self.bot.get_user(admin_id)
-            if admin_user:
-                await admin_user.send(
-                    f"🔄 Revision requested by {student.mention} in {ctx.channel.mention}.\n"
-                    f"Details: {revision_details}"
-                )
-
-    @commands.command(name='close_assignment')
+        await notify_admins(
+            self.bot,
+            f"🔄 Revision requested by {student.mention} in {ctx.channel.mention}.\n"
+            f"Details: {revision_details}"
+        )
+
+    @commands.hybrid_command(name='close_assignment')
+    @commands.guild_only()
     @commands.has_permissions(manage_guild=True)
     async def close_assignment(self, ctx):
         """
@@ -268,14 +297,21 @@ class AssignmentManagement(commands.Cog):
         # Check if the command is used in an assignment channel
         assignment = self.assignments.get(ctx.channel.id)
         if not assignment:
-            await ctx.send("This command can only be used in an assignment channel.")
+            await ctx.send("This command can only be used in an assignment channel.", ephemeral=True)
             return
 
         await ctx.send("✅ This assignment channel will be closed in 1 minute.")
         await asyncio.sleep(60)
+        await self._archive_transcript(ctx.channel, assignment)
         await ctx.channel.delete()
         del self.assignments[ctx.channel.id]
 
+    async def _archive_transcript(self, channel, assignment):
+        """Archives the channel transcript before deletion, if the Archival cog is loaded."""
+        archival_cog = self.bot.get_cog('Archival')
+        if archival_cog:
+            await archival_cog.archive_channel(channel, assignment['assignment_id'])
+
     @tasks.loop(minutes=60)
     async def deadline_reminder(self):
         """Task that runs every hour to check for upcoming deadlines and send reminders."""
@@ -286,19 +322,23 @@ class AssignmentManagement(commands.Cog):
                 time_to_deadline = assignment['deadline'] - now
                 # If less than 24 hours to deadline and no reminder sent in last 24 hours
                 if time_to_deadline < timedelta(hours=24) and (not assignment['last_reminder'] or (now - assignment['last_reminder'] > timedelta(hours=24))):
-                    # Send reminder to admin
-                    for admin_id in config.ADMIN_IDS:
-                        admin_user = self.bot.get_user(admin_id)
-                        if admin_user:
-                            await admin_user.send(
-                                f"⏰ Reminder: Assignment {assignment['assignment_id']} in {assignment['channel'].mention} "
-                                f"is due in {time_to_deadline}."
-                            )
+                    # Mark the reminder first so a cancelled iteration (e.g. during !reload) isn't repeated
                     assignment['last_reminder'] = now
 
+                    # Send reminder to admin
+                    await notify_admins(
+                        self.bot,
+                        f"⏰ Reminder: Assignment {assignment['assignment_id']} in {assignment['channel'].mention} "
+                        f"is due in {time_to_deadline}.",
+                        urgent=time_to_deadline < timedelta(hours=1)
+                    )
+
     @deadline_reminder.before_loop
     async def before_deadline_reminder(self):
         await self.bot.wait_until_ready()
+        if self.reminder_resume_at:
+            # Keep the previous instance's schedule instead of firing immediately after a reload
+            await discord.utils.sleep_until(self.reminder_resume_at)
 
 async def setup(bot):
     await bot.add_cog(AssignmentManagement(bot))
@@ -2,9 +2,23 @@
 
 import discord
 from discord.ext import commands, tasks
+import asyncio
+import json
+import logging
+import os
 import config
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
+WELCOME_DM_RATE = getattr(config, 'WELCOME_DM_RATE', 1)  # Welcome DMs sent per second
+WELCOME_DEDUP_HOURS = getattr(config, 'WELCOME_DEDUP_HOURS', 24)  # Rejoins within this window are not welcomed again
+WELCOME_STATE_PATH = getattr(config, 'WELCOME_STATE_PATH', 'data/welcome_state.json')
+
+ADMIN_DIGEST_ENABLED = getattr(config, 'ADMIN_DIGEST_ENABLED', False)  # Batch admin notifications into digests
+ADMIN_DIGEST_INTERVAL_MINUTES = getattr(config, 'ADMIN_DIGEST_INTERVAL_MINUTES', 15)
+ADMIN_DIGEST_MAX_EVENTS = getattr(config, 'ADMIN_DIGEST_MAX_EVENTS', 25)  # Flush early once this many events are buffered
+EMBED_DESCRIPTION_LIMIT = 4096
+
 class Communication(commands.Cog):
     """Cog for managing communications, reminders, and notifications."""
 
@@ -12,6 +26,158 @@ class Communication(commands.Cog):
         self.bot = bot
         self.reminder_tasks = {}  # {channel_id: task}
         self.broadcast_channel_id = config.BROADCAST_CHANNEL_ID  # Channel ID for broadcasting messages
+        self.scheduled_broadcasts = {}  # {task: (broadcast_time, message)}
+
+        # Welcome DM queue
+        self.welcome_queue = OrderedDict()  # {member_id: (member, queued_at)}
+        self.recent_welcomes = {}  # {member_id: queued_at}
+        self.dm_disabled = set()  # Member IDs that rejected a welcome DM
+        self.welcome_stats = {'queued': 0, 'sent': 0, 'deduplicated': 0, 'skipped': 0, 'forbidden': 0, 'failed': 0}
+        self.welcome_state_dirty = False
+        self.welcome_sender.change_interval(seconds=1 / WELCOME_DM_RATE)
+        self.welcome_sender.start()  # Start draining the welcome queue
+
+        # Admin notification digests
+        self.admin_digests = {}  # {admin_id: [(timestamp, message)]}
+        self.digest_resume_at = None
+
+        # Restore state handed over by a previous instance during !reload
+        state = self.bot.cog_state_handoff.get('Communication')
+        if state:
+            self.reminder_tasks = state['reminder_tasks']
+            self.welcome_queue = state['welcome_queue']
+            self.recent_welcomes = state['recent_welcomes']
+            self.dm_disabled = state['dm_disabled']
+            self.welcome_stats = state['welcome_stats']
+            self.admin_digests = state['admin_digests']
+            self.digest_resume_at = state['digest_resume_at']
+            for broadcast_time, message in state['broadcasts']:
+                self._schedule_broadcast(broadcast_time, message)
+        elif os.path.exists(WELCOME_STATE_PATH):
+            with open(WELCOME_STATE_PATH, encoding='utf-8') as f:
+                data = json.load(f)
+            cutoff = datetime.now() - timedelta(hours=WELCOME_DEDUP_HOURS)
+            self.dm_disabled = set(data['dm_disabled'])
+            self.recent_welcomes = {
+                int(member_id): datetime.fromisoformat(queued_at)
+                for member_id, queued_at in data['recent_welcomes'].items()
+                if datetime.fromisoformat(queued_at) > cutoff
+            }
+
+        self.save_welcome_state.start()  # Start the periodic welcome state flush
+
+        if ADMIN_DIGEST_ENABLED:
+            self.digest_flusher.change_interval(minutes=ADMIN_DIGEST_INTERVAL_MINUTES)
+            self.digest_flusher.start()
+
+    async def cog_unload(self):
+        self.welcome_sender.cancel()
+        self.digest_flusher.cancel()
+        self.save_welcome_state.cancel()
+        if self.welcome_state_dirty:
+            self._write_welcome_state(self._serialize_welcome_state())
+        for task in list(self.scheduled_broadcasts):
+            task.cancel()
+
+        # Buffered digests are handed over during !reload; otherwise (e.g. on shutdown) send them now
+        if 'Communication' not in self.bot.cog_state_handoff:
+            for admin_id in list(self.admin_digests):
+                await self._flush_digest(admin_id)
+
+    def export_state(self):
+        """Returns the live state to hand over to the reloaded instance."""
+        return {
+            'reminder_tasks': self.reminder_tasks,
+            'broadcasts': list(self.scheduled_broadcasts.values()),
+            'welcome_queue': self.welcome_queue,
+            'recent_welcomes': self.recent_welcomes,
+            'dm_disabled': self.dm_disabled,
+            'welcome_stats': self.welcome_stats,
+            'admin_digests': self.admin_digests,
+            # next_iteration is None while before_loop is still waiting for a handed-over schedule
+            'digest_resume_at': self.digest_flusher.next_iteration or self.digest_resume_at,
+        }
+
+    def _serialize_welcome_state(self):
+        return json.dumps({
+            'dm_disabled': list(self.dm_disabled),
+            'recent_welcomes': {
+                str(member_id): queued_at.isoformat() for member_id, queued_at in self.recent_welcomes.items()
+            },
+        })
+
+    def _write_welcome_state(self, data):
+        directory = os.path.dirname(WELCOME_STATE_PATH)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = f"{WELCOME_STATE_PATH}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, WELCOME_STATE_PATH)
+
+    async def notify_admins(self, message, urgent=False):
+        """
+        Notifies every admin. In digest mode non-urgent events are buffered and sent as one embed per interval.
+        """
+        for admin_id in config.ADMIN_IDS:
+            if not ADMIN_DIGEST_ENABLED or urgent:
+                await self._send_admin_dm(admin_id, content=message)
+                continue
+
+            buffer = self.admin_digests.setdefault(admin_id, [])
+            buffer.append((datetime.now(), message))
+            if len(buffer) >= ADMIN_DIGEST_MAX_EVENTS:
+                await self._flush_digest(admin_id)
+
+    async def _flush_digest(self, admin_id):
+        events = self.admin_digests.pop(admin_id, None)
+        if not events:
+            return
+
+        # Split the events across as many embeds as the description limit requires
+        chunks = []  # [(description, events)]
+        description = ""
+        chunk_events = []
+        for event in events:
+            timestamp, message = event
+            line = f"`{timestamp.strftime('%H:%M')}` {message}\n"
+            if description and len(description) + len(line) > EMBED_DESCRIPTION_LIMIT:
+                chunks.append((description, chunk_events))
+                description = ""
+                chunk_events = []
+            description += line[:EMBED_DESCRIPTION_LIMIT]
+            chunk_events.append(event)
+        chunks.append((description, chunk_events))
+
+        for index, (description, chunk_events) in enumerate(chunks, start=1):
+            title = f"📋 Admin Digest ({len(events)} events)"
+            if len(chunks) > 1:
+                title += f" {index}/{len(chunks)}"
+            embed = discord.Embed(title=title, description=description, color=discord.Color.blue())
+            embed.timestamp = datetime.utcnow()
+            if not await self._send_admin_dm(admin_id, embed=embed):
+                # Put the unsent events back ahead of anything buffered meanwhile and retry next flush
+                unsent = [event for _, chunk in chunks[index - 1:] for event in chunk]
+                self.admin_digests[admin_id] = unsent + self.admin_digests.get(admin_id, [])
+                return
+
+    async def _send_admin_dm(self, admin_id, **kwargs):
+        """
+        Sends a DM to an admin. Returns False only when the send failed in a way worth retrying.
+        """
+        admin_user = self.bot.get_user(admin_id)
+        if admin_user:
+            try:
+                await admin_user.send(**kwargs)
+            except discord.Forbidden:
+                logging.warning(f'Unable to send a notification to admin {admin_id}. They may have DMs disabled.')
+            except discord.HTTPException as e:
+                if e.status >= 500 or e.status == 429:
+                    logging.warning(f'Failed to send a notification to admin {admin_id}; will retry.', exc_info=True)
+                    return False
+                # Rejected payloads would fail again on retry
+                logging.error(f'Discord rejected a notification to admin {admin_id}.', exc_info=True)
+        return True
 
     @commands.command(name='send_reminder')
     @commands.has_permissions(manage_guild=True)
@@ -41,13 +207,20 @@ class Communication(commands.Cog):
                 await ctx.send("⚠️ The scheduled time must be in the future.")
                 return
 
-            self.bot.loop.create_task(self._broadcast_message(delay, message))
+            self._schedule_broadcast(broadcast_time, message)
             await ctx.send(f"✅ Broadcast scheduled for {broadcast_time.strftime('%Y-%m-%d %H:%M')}.")
         except ValueError:
             await ctx.send("⚠️ Please provide the time in the format: YYYY-MM-DD HH:MM")
 
-    async def _broadcast_message(self, delay, message):
-        await asyncio.sleep(delay)
+    def _schedule_broadcast(self, broadcast_time, message):
+        task = self.bot.loop.create_task(self._broadcast_message(broadcast_time, message))
+        self.scheduled_broadcasts[task] = (broadcast_time, message)
+        task.add_done_callback(lambda t: self.scheduled_broadcasts.pop(t, None))
+
+    async def _broadcast_message(self, broadcast_time, message):
+        await asyncio.sleep(max((broadcast_time - datetime.now()).total_seconds(), 0))
+        # Stop tracking before sending so a reload mid-send neither reschedules nor cancels it
+        self.scheduled_broadcasts.pop(asyncio.current_task(), None)
         channel = self.bot.get_channel(self.broadcast_channel_id)
         if channel:
             await channel.send(message)
@@ -67,16 +240,114 @@ class Communication(commands.Cog):
         except discord.Forbidden:
             await ctx.send(f"❌ Unable to send a DM to {member.display_name}. They may have DMs disabled.")
 
+    @commands.command(name='welcome_stats')
+    @commands.has_permissions(manage_guild=True)
+    async def welcome_stats_command(self, ctx):
+        """
+        Admin command to show welcome DM queue metrics.
+        Usage: !welcome_stats
+        """
+        backlog = len(self.welcome_queue)
+        embed = discord.Embed(title="Welcome DM Queue", color=discord.Color.blue())
+        embed.add_field(name="Backlog", value=str(backlog), inline=True)
+        if backlog:
+            _, oldest_queued_at = next(iter(self.welcome_queue.values()))
+            oldest_wait = datetime.now() - oldest_queued_at
+            embed.add_field(name="Oldest Wait", value=f"{oldest_wait.total_seconds():.0f}s", inline=True)
+            embed.add_field(name="Estimated Drain", value=f"{backlog / WELCOME_DM_RATE:.0f}s", inline=True)
+        embed.add_field(name="Send Rate", value=f"{WELCOME_DM_RATE}/s", inline=True)
+        for name, value in self.welcome_stats.items():
+            embed.add_field(name=name.capitalize(), value=str(value), inline=True)
+        embed.add_field(name="DMs Disabled", value=str(len(self.dm_disabled)), inline=True)
+        await ctx.send(embed=embed)
+
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """
         Event listener for when a member joins the server.
-        Sends a welcome message via DM.
+        Queues a welcome DM so join bursts are sent at a steady rate.
         """
+        if member.id in self.dm_disabled:
+            self.welcome_stats['skipped'] += 1
+            return
+
+        now = datetime.now()
+        if member.id in self.welcome_queue:
+            # Coalesce repeated joins into the already-queued welcome
+            _, queued_at = self.welcome_queue[member.id]
+            self.welcome_queue[member.id] = (member, queued_at)
+            self.welcome_stats['deduplicated'] += 1
+            return
+
+        window = timedelta(hours=WELCOME_DEDUP_HOURS)
+        last_welcome = self.recent_welcomes.get(member.id)
+        if last_welcome and now - last_welcome < window:
+            self.welcome_stats['deduplicated'] += 1
+            return
+
+        if len(self.recent_welcomes) > 1024:
+            self.recent_welcomes = {
+                member_id: queued_at for member_id, queued_at in self.recent_welcomes.items()
+                if now - queued_at < window
+            }
+
+        self.recent_welcomes[member.id] = now
+        self.welcome_state_dirty = True
+        self.welcome_queue[member.id] = (member, now)
+        self.welcome_stats['queued'] += 1
+
+    @tasks.loop(seconds=1)
+    async def welcome_sender(self):
+        """Task that sends one queued welcome DM per tick at WELCOME_DM_RATE."""
+        if not self.welcome_queue:
+            return
+
+        _, (member, queued_at) = self.welcome_queue.popitem(last=False)
         try:
             await member.send(f"Welcome to {member.guild.name}! Feel free to reach out if you have any questions.")
+            self.welcome_stats['sent'] += 1
+        except asyncio.CancelledError:
+            # Cancelled mid-send (e.g. during !reload); put the member back at the front of the shared queue
+            self.welcome_queue[member.id] = (member, queued_at)
+            self.welcome_queue.move_to_end(member.id, last=False)
+            raise
         except discord.Forbidden:
-            pass  # Member has DMs disabled
+            # Member has DMs disabled; don't try again
+            self.dm_disabled.add(member.id)
+            self.welcome_state_dirty = True
+            self.welcome_stats['forbidden'] += 1
+        except discord.HTTPException:
+            self.welcome_stats['failed'] += 1
+
+    @welcome_sender.before_loop
+    async def before_welcome_sender(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(minutes=1)
+    async def save_welcome_state(self):
+        """Task that persists DM-disabled members and recent welcomes when they have changed."""
+        if not self.welcome_state_dirty:
+            return
+        self.welcome_state_dirty = False
+        data = self._serialize_welcome_state()
+        try:
+            await asyncio.to_thread(self._write_welcome_state, data)
+        except OSError:
+            self.welcome_state_dirty = True
+            logging.error('Failed to save the welcome state.', exc_info=True)
+
+    @tasks.loop(minutes=15)
+    async def digest_flusher(self):
+        """Task that flushes buffered admin notifications every ADMIN_DIGEST_INTERVAL_MINUTES."""
+        for admin_id in list(self.admin_digests):
+            await self._flush_digest(admin_id)
+
+    @digest_flusher.before_loop
+    async def before_digest_flusher(self):
+        await self.bot.wait_until_ready()
+        if self.digest_resume_at:
+            # Keep the previous instance's schedule instead of flushing immediately after a reload
+            await discord.utils.sleep_until(self.digest_resume_at)
 
 async def setup(bot):
     await bot.add_cog(Communication(bot))
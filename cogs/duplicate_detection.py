@@ -0,0 +1,207 @@
+# cogs/duplicate_detection.py
+
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .utilities import compute_submission_signature, notify_admins, MINHASH_PERMUTATIONS, TEXT_EXTENSIONS
+import config
+
+LSH_BANDS = 32  # Bands of MINHASH_PERMUTATIONS // LSH_BANDS rows each
+DUPLICATE_THRESHOLD = getattr(config, 'DUPLICATE_THRESHOLD', 0.5)  # Minimum estimated Jaccard similarity to report
+MAX_ATTACHMENT_BYTES = 10 * 1024 * 1024
+DUPLICATE_WORKERS = getattr(config, 'DUPLICATE_WORKERS', 2)
+DUPLICATE_INDEX_PATH = getattr(config, 'DUPLICATE_INDEX_PATH', 'data/duplicate_signatures.json')
+
+class DuplicateDetection(commands.Cog):
+    """Cog for flagging near-duplicate assignment submissions before review."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        # Forking a process with a running event loop and helper threads can deadlock the workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=DUPLICATE_WORKERS, mp_context=multiprocessing.get_context('forkserver')
+        )
+        self.rows = MINHASH_PERMUTATIONS // LSH_BANDS
+        self.buckets = [{} for _ in range(LSH_BANDS)]  # [{band hash: set of keys}]
+        self.signatures = {}  # {(assignment_id, message_id): signature}
+        self.assignment_channels = {}  # {assignment_id: channel_id}
+        self.alerted_pairs = set()  # {(assignment_id, other_id)} already reported to admins
+        self.dirty = False
+
+        # Restore state handed over by a previous instance during !reload
+        state = self.bot.cog_state_handoff.get('DuplicateDetection')
+        if state:
+            self.buckets = state['buckets']
+            self.signatures = state['signatures']
+            self.assignment_channels = state['assignment_channels']
+            self.alerted_pairs = state['alerted_pairs']
+            self.dirty = state['dirty']
+        elif os.path.exists(DUPLICATE_INDEX_PATH):
+            with open(DUPLICATE_INDEX_PATH, encoding='utf-8') as f:
+                data = json.load(f)
+            for assignment_id, message_id, signature in data['signatures']:
+                self.insert((assignment_id, message_id), signature)
+            self.assignment_channels = data['assignment_channels']
+            self.alerted_pairs = {tuple(pair) for pair in data['alerted_pairs']}
+            self.dirty = False
+
+        self.save_index.start()  # Start the periodic signature flush
+
+    def cog_unload(self):
+        self.save_index.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.dirty:
+            self._write_index(self._serialize(self._snapshot()))
+
+    def export_state(self):
+        """Returns the live state to hand over to the reloaded instance."""
+        return {
+            'buckets': self.buckets,
+            'signatures': self.signatures,
+            'assignment_channels': self.assignment_channels,
+            'alerted_pairs': self.alerted_pairs,
+            'dirty': self.dirty,
+        }
+
+    def _snapshot(self):
+        # Signature lists are never mutated once inserted, so shallow copies are enough
+        return {
+            'signatures': list(self.signatures.items()),
+            'assignment_channels': dict(self.assignment_channels),
+            'alerted_pairs': list(self.alerted_pairs),
+        }
+
+    def _serialize(self, snapshot):
+        return json.dumps({
+            'signatures': [[key[0], key[1], signature] for key, signature in snapshot['signatures']],
+            'assignment_channels': snapshot['assignment_channels'],
+            'alerted_pairs': [list(pair) for pair in snapshot['alerted_pairs']],
+        })
+
+    def _write_index(self, data):
+        directory = os.path.dirname(DUPLICATE_INDEX_PATH)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = f"{DUPLICATE_INDEX_PATH}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, DUPLICATE_INDEX_PATH)
+
+    def _bands(self, signature):
+        for band in range(LSH_BANDS):
+            yield band, hash(tuple(signature[band * self.rows:(band + 1) * self.rows]))
+
+    def insert(self, key, signature):
+        """
+        Adds a signature to the locality-sensitive hashing index.
+        """
+        self.signatures[key] = signature
+        self.dirty = True
+        for band, band_hash in self._bands(signature):
+            self.buckets[band].setdefault(band_hash, set()).add(key)
+
+    def query(self, assignment_id, signature):
+        """
+        Returns {assignment_id: estimated similarity} for other assignments sharing an LSH bucket.
+        """
+        candidates = set()
+        for band, band_hash in self._bands(signature):
+            candidates.update(self.buckets[band].get(band_hash, ()))
+
+        matches = {}
+        for key in candidates:
+            if key[0] == assignment_id:
+                continue
+            other = self.signatures[key]
+            similarity = sum(1 for a, b in zip(signature, other) if a == b) / MINHASH_PERMUTATIONS
+            if similarity >= DUPLICATE_THRESHOLD:
+                matches[key[0]] = max(similarity, matches.get(key[0], 0))
+        return matches
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        """
+        Event listener that fingerprints messages and attachments posted in assignment channels.
+        """
+        if message.author.bot:
+            return
+
+        assignment_cog = self.bot.get_cog('AssignmentManagement')
+        assignment = assignment_cog.assignments.get(message.channel.id) if assignment_cog else None
+        if not assignment:
+            return
+
+        # Only the student's submission matters; admins post the same instructions everywhere
+        if message.author != assignment['student']:
+            return
+
+        attachments = []
+        for attachment in message.attachments:
+            if attachment.size > MAX_ATTACHMENT_BYTES:
+                continue
+            # Skip downloads of file types extract_text cannot read
+            if not attachment.filename.lower().endswith(TEXT_EXTENSIONS + ('.docx',)):
+                continue
+            try:
+                attachments.append((attachment.filename, await attachment.read()))
+            except discord.HTTPException:
+                logging.warning(f'Could not download attachment {attachment.filename} for duplicate detection.')
+
+        # Extraction and hashing are CPU-bound, so keep them off the event loop
+        loop = asyncio.get_running_loop()
+        signature = await loop.run_in_executor(
+            self.executor, compute_submission_signature, message.content, attachments
+        )
+        if signature is None:
+            return
+
+        assignment_id = assignment['assignment_id']
+        self.assignment_channels[assignment_id] = message.channel.id
+        matches = self.query(assignment_id, signature)
+        self.insert((assignment_id, message.id), signature)
+
+        if assignment['reviewed']:
+            return
+
+        # Report each pair once, however many messages or attachments match
+        new_matches = {
+            other_id: similarity for other_id, similarity in matches.items()
+            if (assignment_id, other_id) not in self.alerted_pairs
+        }
+        if not new_matches:
+            return
+        self.alerted_pairs.update((assignment_id, other_id) for other_id in new_matches)
+
+        lines = []
+        for other_id, similarity in sorted(new_matches.items(), key=lambda item: item[1], reverse=True):
+            channel_id = self.assignment_channels.get(other_id)
+            location = f" (<#{channel_id}>)" if channel_id else ""
+            lines.append(f"• Assignment {other_id}{location}: ~{similarity:.0%} similar")
+
+        await notify_admins(
+            self.bot,
+            f"🔁 Possible duplicate submission in {message.channel.mention} "
+            f"(Assignment {assignment_id}):\n" + "\n".join(lines),
+            urgent=True  # Must reach admins before they run confirm_assignment
+        )
+
+    @tasks.loop(minutes=1)
+    async def save_index(self):
+        """Task that persists the signatures to disk when they have changed."""
+        if not self.dirty:
+            return
+        self.dirty = False
+        snapshot = self._snapshot()
+        try:
+            await asyncio.to_thread(lambda: self._write_index(self._serialize(snapshot)))
+        except OSError:
+            self.dirty = True
+            logging.error('Failed to save the duplicate signature index.', exc_info=True)
+
+async def setup(bot):
+    await bot.add_cog(DuplicateDetection(bot))
@@ -1,9 +1,11 @@
 # cogs/feedback.py
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 import config
 from datetime import datetime
+from .utilities import notify_admins
 
 class Feedback(commands.Cog):
     """Cog for handling feedback, reviews, and dispute resolutions."""
@@ -12,18 +14,23 @@ class Feedback(commands.Cog):
         self.bot = bot
         self.reviews_channel_id = config.REVIEWS_CHANNEL_ID  # Channel ID for #reviews channel
 
-    @commands.command(name='leave_review')
-    async def leave_review(self, ctx, rating: int, *, comment=None):
+    @commands.hybrid_command(name='leave_review')
+    @commands.guild_only()
+    @app_commands.describe(rating="Rating from 1 to 5", comment="Optional comment about your experience")
+    async def leave_review(self, ctx, rating: int, *, comment: str = None):
         """
         Command for students to leave a review.
         Usage: !leave_review rating [comment]
         """
+        # Posting to the reviews channel happens before the reply
+        await ctx.defer(ephemeral=True)
+
         if ctx.channel.name.startswith('assignment-'):
             assignment_id = ctx.channel.name.replace('assignment-', '')
             student = ctx.author
 
             if rating < 1 or rating > 5:
-                await ctx.send("⚠️ Please provide a rating between 1 and 5.")
+                await ctx.send("⚠️ Please provide a rating between 1 and 5.", ephemeral=True)
                 return
 
             reviews_channel = self.bot.get_channel(self.reviews_channel_id)
@@ -37,49 +44,67 @@ class Feedback(commands.Cog):
                 embed.timestamp = datetime.utcnow()
 
                 await reviews_channel.send(embed=embed)
-                await ctx.send("✅ Thank you for your review!")
+
+                search_cog = self.bot.get_cog('Search')
+                if search_cog and comment:
+                    search_cog.index_document(assignment_id, 'review', comment)
+
+                await ctx.send("✅ Thank you for your review!", ephemeral=True)
             else:
-                await ctx.send("⚠️ Reviews channel not found.")
+                await ctx.send("⚠️ Reviews channel not found.", ephemeral=True)
         else:
-            await ctx.send("⚠️ This command can only be used in your assignment channel.")
+            await ctx.send("⚠️ This command can only be used in your assignment channel.", ephemeral=True)
 
-    @commands.command(name='initiate_dispute')
-    async def initiate_dispute(self, ctx, *, reason):
+    @commands.hybrid_command(name='initiate_dispute')
+    @commands.guild_only()
+    @app_commands.describe(reason="Reason for the dispute")
+    async def initiate_dispute(self, ctx, *, reason: str):
         """
         Command for students to initiate a dispute.
         Usage: !initiate_dispute Reason for the dispute
         """
+        # Notifying every admin can outlast the interaction window
+        await ctx.defer(ephemeral=True)
+
         if ctx.channel.name.startswith('assignment-'):
             assignment_id = ctx.channel.name.replace('assignment-', '')
             student = ctx.author
 
             # Notify admins of the dispute
-            for admin_id in config.ADMIN_IDS:
-                admin_user = self.bot.get_user(admin_id)
-                if admin_user:
-                    await admin_user.send(
-                        f"⚠️ Dispute initiated by {student.display_name} for Assignment {assignment_id}.\n"
-                        f"Reason: {reason}\n"
-                        f"Channel: {ctx.channel.mention}"
-                    )
-
-            await ctx.send("⚠️ Your dispute has been recorded. An admin will review it shortly.")
+            await notify_admins(
+                self.bot,
+                f"⚠️ Dispute initiated by {student.display_name} for Assignment {assignment_id}.\n"
+                f"Reason: {reason}\n"
+                f"Channel: {ctx.channel.mention}",
+                urgent=True
+            )
+
+            search_cog = self.bot.get_cog('Search')
+            if search_cog:
+                search_cog.index_document(assignment_id, 'dispute', reason)
+
+            await ctx.send("⚠️ Your dispute has been recorded. An admin will review it shortly.", ephemeral=True)
         else:
-            await ctx.send("⚠️ This command can only be used in your assignment channel.")
+            await ctx.send("⚠️ This command can only be used in your assignment channel.", ephemeral=True)
 
-    @commands.command(name='resolve_dispute')
+    @commands.hybrid_command(name='resolve_dispute')
+    @commands.guild_only()
     @commands.has_permissions(manage_guild=True)
-    async def resolve_dispute(self, ctx, *, resolution):
+    @app_commands.describe(resolution="Resolution details sent to the student")
+    async def resolve_dispute(self, ctx, *, resolution: str):
         """
         Admin command to resolve a dispute.
         Usage: !resolve_dispute Resolution details
         """
+        # Messaging the student can outlast the interaction window
+        await ctx.defer(ephemeral=True)
+
         if ctx.channel.name.startswith('assignment-'):
             assignment_id = ctx.channel.name.replace('assignment-', '')
             assignment_cog = self.bot.get_cog('AssignmentManagement')
             assignment = assignment_cog.assignments.get(ctx.channel.id)
             if not assignment:
-                await ctx.send("⚠️ Assignment data not found.")
+                await ctx.send("⚠️ Assignment data not found.", ephemeral=True)
                 return
 
             student = assignment['student']
@@ -94,9 +119,13 @@ class Feedback(commands.Cog):
             except discord.Forbidden:
                 await ctx.send(f"⚠️ Unable to send DM to {student.display_name}.")
 
+            search_cog = self.bot.get_cog('Search')
+            if search_cog:
+                search_cog.index_document(assignment_id, 'resolution', resolution)
+
             await ctx.send("✅ Dispute has been resolved and the student has been notified.")
         else:
-            await ctx.send("⚠️ This command can only be used in an assignment channel.")
+            await ctx.send("⚠️ This command can only be used in an assignment channel.", ephemeral=True)
 
 async def setup(bot):
     await bot.add_cog(Feedback(bot))
\ No newline at end of file
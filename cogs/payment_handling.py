@@ -1,9 +1,10 @@
 # cogs/payment_handling.py
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 import asyncio
-from .utilities import create_payment_links, verify_payment
+from .utilities import create_payment_links, verify_payment, notify_admins
 import config
 
 class PaymentHandling(commands.Cog):
@@ -13,7 +14,18 @@ class PaymentHandling(commands.Cog):
         self.bot = bot
         self.payment_sessions = {}  # Stores payment data
 
-    @commands.command(name='generate_payment')
+        # Restore state handed over by a previous instance during !reload
+        state = self.bot.cog_state_handoff.get('PaymentHandling')
+        if state:
+            self.payment_sessions = state['payment_sessions']
+
+    def export_state(self):
+        """Returns the live state to hand over to the reloaded instance."""
+        return {'payment_sessions': self.payment_sessions}
+
+    @commands.hybrid_command(name='generate_payment')
+    @commands.guild_only()
+    @app_commands.describe(amount="Payment amount in USD")
     async def generate_payment(self, ctx, amount: float):
         """
         Command to generate payment links after assignment confirmation.
@@ -22,7 +34,7 @@ class PaymentHandling(commands.Cog):
 
         # Only allow admins to use this command
         if ctx.author.id not in config.ADMIN_IDS:
-            await ctx.send("You do not have permission to use this command.")
+            await ctx.send("You do not have permission to use this command.", ephemeral=True)
             return
 
         # Check if the command is used in an assignment channel
@@ -33,16 +45,18 @@ class PaymentHandling(commands.Cog):
         assignment_cog = self.bot.get_cog('AssignmentManagement')
         assignment = assignment_cog.assignments.get(assignment_channel.id)
         if not assignment:
-            await ctx.send("This command can only be used in an assignment channel.")
+            await ctx.send("This command can only be used in an assignment channel.", ephemeral=True)
             return
 
         if assignment['status'] != 'Awaiting Payment':
-            await ctx.send("Payment has already been generated or the assignment is not ready for payment.")
+            await ctx.send("Payment has already been generated or the assignment is not ready for payment.", ephemeral=True)
             return
 
         # Generate payment links
         payment_id = f"{assignment_id}-{assignment['student'].id}"
-        payment_links = create_payment_links(payment_id, amount)
+        # The Stripe call can outlast the interaction window, so acknowledge first
+        await ctx.defer()
+        payment_links = await asyncio.to_thread(create_payment_links, payment_id, amount)
 
         if not payment_links:
             await ctx.send("Error generating payment links. Please check the payment gateway configuration.")
@@ -61,14 +75,15 @@ class PaymentHandling(commands.Cog):
         assignment['status'] = 'Awaiting Payment Confirmation'
 
         # Send payment links to the student in the assignment channel
-        await assignment_channel.send(
+        await ctx.send(
             f"{assignment['student'].mention}, please complete your payment of **${amount:.2f}** using one of the following options:\n"
             f"**PayPal:** {payment_links['paypal']}\n"
             f"**Stripe:** {payment_links['stripe']}\n"
-            "After completing the payment, please use the `!confirm_payment` command."
+            "After completing the payment, please use the `/confirm_payment` (or `!confirm_payment`) command."
         )
 
-    @commands.command(name='confirm_payment')
+    @commands.hybrid_command(name='confirm_payment')
+    @commands.guild_only()
     async def confirm_payment(self, ctx):
         """
         Command for students to confirm payment.
@@ -83,22 +98,23 @@ class PaymentHandling(commands.Cog):
         assignment_cog = self.bot.get_cog('AssignmentManagement')
         assignment = assignment_cog.assignments.get(assignment_channel.id)
         if not assignment:
-            await ctx.send("This command can only be used in your assignment channel.")
+            await ctx.send("This command can only be used in your assignment channel.", ephemeral=True)
             return
 
         student = assignment['student']
         if ctx.author != student:
-            await ctx.send("Only the assignment owner can confirm payment.")
+            await ctx.send("Only the assignment owner can confirm payment.", ephemeral=True)
             return
 
         if assignment['status'] != 'Awaiting Payment Confirmation':
-            await ctx.send("Payment is not pending for this assignment.")
+            await ctx.send("Payment is not pending for this assignment.", ephemeral=True)
             return
 
         payment_id = f"{assignment_id}-{student.id}"
 
         # Verify the payment
-        payment_successful = verify_payment(payment_id)
+        await ctx.defer()
+        payment_successful = await asyncio.to_thread(verify_payment, payment_id)
 
         if payment_successful:
             await ctx.send("✅ Thank you! Your payment has been received. We will start working on your assignment shortly.")
@@ -111,18 +127,18 @@ class PaymentHandling(commands.Cog):
                 await payment_status_channel.send(f"**Assignment ID:** {assignment_id} | **Status:** Paid | **Amount:** ${self.payment_sessions[payment_id]['amount']:.2f}")
 
             # Notify admins
-            for admin_id in config.ADMIN_IDS:
-                admin_user = self.bot.get_user(admin_id)
-                if admin_user:
-                    await admin_user.send(
-                        f"💵 Payment received for Assignment {assignment_id} in {assignment_channel.mention}. You may begin working on the assignment."
-                    )
+            await notify_admins(
+                self.bot,
+                f"💵 Payment received for Assignment {assignment_id} in {assignment_channel.mention}. You may begin working on the assignment."
+            )
 
         else:
             await ctx.send("⚠️ We could not verify your payment. Please ensure you've completed the payment and try again.")
 
-    @commands.command(name='check_payment_status')
+    @commands.hybrid_command(name='check_payment_status')
+    @commands.guild_only()
     @commands.has_permissions(manage_guild=True)
+    @app_commands.describe(assignment_id="The assignment ID to look up")
     async def check_payment_status(self, ctx, assignment_id: str):
         """
         Admin command to check the payment status of an assignment.
@@ -133,13 +149,13 @@ class PaymentHandling(commands.Cog):
 
         payment_session = self.payment_sessions.get(payment_id)
         if not payment_session:
-            await ctx.send(f"No payment record found for Assignment ID: {assignment_id}")
+            await ctx.send(f"No payment record found for Assignment ID: {assignment_id}", ephemeral=True)
             return
 
         if payment_session['paid']:
-            await ctx.send(f"✅ Payment has been received for Assignment ID: {assignment_id}.")
+            await ctx.send(f"✅ Payment has been received for Assignment ID: {assignment_id}.", ephemeral=True)
         else:
-            await ctx.send(f"❌ Payment is still pending for Assignment ID: {assignment_id}.")
+            await ctx.send(f"❌ Payment is still pending for Assignment ID: {assignment_id}.", ephemeral=True)
 
 async def setup(bot):
     await bot.add_cog(PaymentHandling(bot))
@@ -0,0 +1,235 @@
+# cogs/profiling.py
+
+import discord
+from discord.ext import commands
+import asyncio
+import io
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+import config
+
+PROFILE_SAMPLE_INTERVAL = getattr(config, 'PROFILE_SAMPLE_INTERVAL', 0.005)  # Seconds between stack samples
+SLOW_CALLBACK_THRESHOLD = getattr(config, 'SLOW_CALLBACK_THRESHOLD', 0.1)  # Seconds a callback may hold the loop
+PROFILE_TOP_N = getattr(config, 'PROFILE_TOP_N', 25)
+HEARTBEAT_INTERVAL = 0.02
+MAX_SLOW_CALLBACKS = 100
+
+COGS_DIR = os.path.dirname(os.path.abspath(__file__))
+BOT_FILE = os.path.join(os.path.dirname(COGS_DIR), 'bot.py')
+
+def _frame_label(code):
+    """Returns 'module:Qualified.name' for a code object."""
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+def _is_project_code(code):
+    # Only cogs/ and bot.py count; a virtualenv inside the repo must not match
+    filename = code.co_filename
+    return filename == BOT_FILE or filename.startswith(COGS_DIR + os.sep)
+
+class StackSampler(threading.Thread):
+    """Background thread that samples the event loop thread's stack and watches for stalls."""
+
+    def __init__(self, loop_thread_id):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.loop_thread_id = loop_thread_id
+        self.stop_event = threading.Event()
+        self.heartbeat = time.monotonic()
+        self.started_at = None
+        self.samples = 0
+        self.idle_samples = 0
+        self.attributed = Counter()  # {cog/command label: samples}
+        self.leaf_functions = Counter()  # {function label: samples}
+        self.slow_callbacks = []  # [(duration, label, stack)]
+        self._stall = None  # (started, label, stack) for the stall in progress
+
+    def run(self):
+        self.started_at = time.monotonic()
+        while not self.stop_event.wait(PROFILE_SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is not None:
+                self._sample(frame)
+            self._check_stall(frame)
+            del frame
+
+    def _sample(self, frame):
+        self.samples += 1
+        leaf = frame.f_code
+        if leaf.co_name == 'select' and 'selectors' in leaf.co_filename:
+            # The loop is waiting for I/O
+            self.idle_samples += 1
+            return
+
+        self.leaf_functions[_frame_label(leaf)] += 1
+        self.attributed[self._attribute(frame)] += 1
+
+    def _attribute(self, frame):
+        """Returns the innermost project frame, i.e. the cog method or command running."""
+        while frame is not None:
+            if _is_project_code(frame.f_code):
+                return _frame_label(frame.f_code)
+            frame = frame.f_back
+        return '<library>'
+
+    def _check_stall(self, frame):
+        stalled_for = time.monotonic() - self.heartbeat
+        if stalled_for >= SLOW_CALLBACK_THRESHOLD:
+            if self._stall is None and frame is not None:
+                stack = []
+                current = frame
+                while current is not None and len(stack) < 8:
+                    stack.append(f"{_frame_label(current.f_code)}:{current.f_lineno}")
+                    current = current.f_back
+                self._stall = (self.heartbeat, self._attribute(frame), ' <- '.join(stack))
+        elif self._stall is not None:
+            started, label, stack = self._stall
+            if len(self.slow_callbacks) < MAX_SLOW_CALLBACKS:
+                self.slow_callbacks.append((self.heartbeat - started, label, stack))
+            self._stall = None
+
+    def report(self):
+        """Builds a plain-text top-N report of the samples collected so far."""
+        elapsed = time.monotonic() - self.started_at
+        busy = self.samples - self.idle_samples
+        lines = [
+            f"CPU profile captured {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Duration: {elapsed:.1f}s | Samples: {self.samples} | Interval: {PROFILE_SAMPLE_INTERVAL * 1000:.1f} ms",
+            f"Loop busy: {busy / max(self.samples, 1):.1%} of samples",
+            "",
+            f"Top {PROFILE_TOP_N} cogs/commands (by busy samples):",
+        ]
+        for label, count in self.attributed.most_common(PROFILE_TOP_N):
+            lines.append(f"  {count / max(busy, 1):6.1%}  {count:6d}  {label}")
+
+        lines += ["", f"Top {PROFILE_TOP_N} functions (self time):"]
+        for label, count in self.leaf_functions.most_common(PROFILE_TOP_N):
+            lines.append(f"  {count / max(busy, 1):6.1%}  {count:6d}  {label}")
+
+        lines += ["", f"Slow callbacks (held the loop >= {SLOW_CALLBACK_THRESHOLD * 1000:.0f} ms):"]
+        if not self.slow_callbacks:
+            lines.append("  None")
+        for duration, label, stack in sorted(self.slow_callbacks, reverse=True)[:PROFILE_TOP_N]:
+            lines.append(f"  {duration * 1000:8.1f} ms  {label}")
+            lines.append(f"             {stack}")
+        return '\n'.join(lines)
+
+class Profiling(commands.Cog):
+    """Cog for on-demand CPU and memory profiling of the running bot."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.sampler = None
+        self.heartbeat_task = None
+        self.memory_baseline = None
+
+    def cog_unload(self):
+        self._stop_sampler()
+        if self.memory_baseline is not None:
+            tracemalloc.stop()
+
+    async def _heartbeat(self, sampler):
+        # Stamps the time every tick; a stale stamp means a callback is holding the loop
+        while True:
+            sampler.heartbeat = time.monotonic()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    def _stop_sampler(self):
+        sampler = self.sampler
+        if sampler is None:
+            return None
+        sampler.stop_event.set()
+        sampler.join()
+        self.heartbeat_task.cancel()
+        self.sampler = None
+        self.heartbeat_task = None
+        return sampler
+
+    async def _send_report(self, ctx, report, filename):
+        report_file = discord.File(io.BytesIO(report.encode('utf-8')), filename=filename)
+        try:
+            await ctx.author.send(f"📊 Profiling report from {ctx.guild.name if ctx.guild else 'the bot'}:", file=report_file)
+            await ctx.send("✅ Report sent via DM.")
+        except discord.Forbidden:
+            await ctx.send("❌ Unable to send the report. You may have DMs disabled.")
+
+    @commands.command(name='profile')
+    @commands.has_permissions(manage_guild=True)
+    async def profile(self, ctx, action: str):
+        """
+        Admin command to start or stop the sampling CPU profiler.
+        Usage: !profile start|stop
+        """
+        action = action.lower()
+        if action == 'start':
+            if self.sampler is not None:
+                await ctx.send("⚠️ The profiler is already running.")
+                return
+            self.sampler = StackSampler(threading.get_ident())
+            self.heartbeat_task = self.bot.loop.create_task(self._heartbeat(self.sampler))
+            self.sampler.start()
+            await ctx.send("⏱️ CPU profiler started. Use `!profile stop` to collect the report.")
+        elif action == 'stop':
+            sampler = self._stop_sampler()
+            if sampler is None:
+                await ctx.send("⚠️ The profiler is not running.")
+                return
+            await self._send_report(ctx, sampler.report(), 'cpu_profile.txt')
+        else:
+            await ctx.send("⚠️ Please use `!profile start` or `!profile stop`.")
+
+    @commands.command(name='memprofile')
+    @commands.has_permissions(manage_guild=True)
+    async def memprofile(self, ctx, action: str = None):
+        """
+        Admin command to capture allocation snapshots. The first call starts tracing,
+        later calls report growth since then.
+        Usage: !memprofile [stop]
+        """
+        if self.memory_baseline is None:
+            if action == 'stop':
+                await ctx.send("⚠️ Allocation tracing is not running.")
+                return
+            tracemalloc.start()
+            self.memory_baseline = await asyncio.to_thread(tracemalloc.take_snapshot)
+            await ctx.send("🧠 Allocation tracing started. Run `!memprofile` again to capture a report.")
+            return
+
+        # Snapshot, filtering and comparison are all Python-heavy, so keep them off the event loop
+        report = await asyncio.to_thread(self._memory_report, self.memory_baseline)
+
+        if action == 'stop':
+            tracemalloc.stop()
+            self.memory_baseline = None
+            report += "\n\nAllocation tracing stopped."
+
+        await self._send_report(ctx, report, 'memory_profile.txt')
+
+    def _memory_report(self, baseline):
+        """Builds a plain-text top-N allocation report against the baseline snapshot."""
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ]
+        snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+        current, peak = tracemalloc.get_traced_memory()
+
+        lines = [
+            f"Allocation snapshot captured {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Traced memory: {current / 1024:.1f} KiB (peak {peak / 1024:.1f} KiB)",
+            "",
+            f"Top {PROFILE_TOP_N} allocation growth since tracing started:",
+        ]
+        for stat in snapshot.compare_to(baseline.filter_traces(filters), 'lineno')[:PROFILE_TOP_N]:
+            lines.append(f"  {stat}")
+        lines += ["", f"Top {PROFILE_TOP_N} current allocations:"]
+        for stat in snapshot.statistics('lineno')[:PROFILE_TOP_N]:
+            lines.append(f"  {stat}")
+        return '\n'.join(lines)
+
+async def setup(bot):
+    await bot.add_cog(Profiling(bot))
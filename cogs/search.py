@@ -0,0 +1,253 @@
+# cogs/search.py
+
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import bisect
+import json
+import logging
+import math
+import os
+import re
+import time
+import config
+
+SEARCH_INDEX_PATH = getattr(config, 'SEARCH_INDEX_PATH', 'data/search_index.json')
+SEARCH_RESULT_LIMIT = 10
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+QUERY_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+def tokenize(text):
+    """
+    Splits text into lowercase alphanumeric terms.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+class Search(commands.Cog):
+    """Cog for full-text search over revisions, disputes, reviews and transcripts."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.postings = {}  # {term: {doc_id: [positions]}}
+        self.docs = {}  # {doc_id: {'assignment_id', 'kind', 'length'}}
+        self.next_doc_id = 0
+        self.dirty = False
+
+        # Restore state handed over by a previous instance during !reload
+        state = self.bot.cog_state_handoff.get('Search')
+        if state:
+            self.postings = state['postings']
+            self.docs = state['docs']
+            self.next_doc_id = state['next_doc_id']
+            self.dirty = state['dirty']
+        elif os.path.exists(SEARCH_INDEX_PATH):
+            with open(SEARCH_INDEX_PATH, encoding='utf-8') as f:
+                data = json.load(f)
+            self.postings = data['postings']
+            self.docs = data['docs']
+            self.next_doc_id = data['next_doc_id']
+
+        self.terms = sorted(self.postings)  # Sorted vocabulary for prefix lookups
+        self.total_length = sum(doc['length'] for doc in self.docs.values())
+        self.save_index.start()  # Start the periodic index flush
+
+    def cog_unload(self):
+        self.save_index.cancel()
+        if self.dirty:
+            self._write_index(self._serialize(self._snapshot()))
+
+    def export_state(self):
+        """Returns the live state to hand over to the reloaded instance."""
+        return {
+            'postings': self.postings,
+            'docs': self.docs,
+            'next_doc_id': self.next_doc_id,
+            'dirty': self.dirty,
+        }
+
+    def index_document(self, assignment_id, kind, text, replace=False):
+        """
+        Adds a piece of text (revision, dispute, resolution, review or transcript) to the index.
+        With replace=True the document is keyed by (assignment_id, kind) and supersedes any earlier version.
+        """
+        if replace:
+            doc_id = f"{assignment_id}:{kind}"
+            self.remove_document(doc_id)
+        else:
+            doc_id = str(self.next_doc_id)
+            self.next_doc_id += 1
+
+        tokens = tokenize(text)
+        if not tokens:
+            return
+
+        self.docs[doc_id] = {'assignment_id': assignment_id, 'kind': kind, 'length': len(tokens)}
+        self.total_length += len(tokens)
+
+        for position, term in enumerate(tokens):
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                bisect.insort(self.terms, term)
+            postings.setdefault(doc_id, []).append(position)
+
+        self.dirty = True
+
+    def remove_document(self, doc_id):
+        """
+        Removes a document and its postings from the index.
+        """
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+
+        self.total_length -= doc['length']
+        for term in [term for term, postings in self.postings.items() if doc_id in postings]:
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+                del self.terms[bisect.bisect_left(self.terms, term)]
+
+        self.dirty = True
+
+    def _expand_prefix(self, prefix):
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + '\uffff')
+        return self.terms[start:end]
+
+    def _term_matches(self, term):
+        """Returns {doc_id: term frequency} for a term, expanding trailing '*' prefixes."""
+        if term.endswith('*'):
+            matches = {}
+            for expanded in self._expand_prefix(term.rstrip('*')):
+                for doc_id, positions in self.postings[expanded].items():
+                    matches[doc_id] = matches.get(doc_id, 0) + len(positions)
+            return matches
+
+        return {doc_id: len(positions) for doc_id, positions in self.postings.get(term, {}).items()}
+
+    def _phrase_matches(self, terms):
+        """Returns {doc_id: phrase frequency} for documents containing the terms consecutively."""
+        postings = [self.postings.get(term) for term in terms]
+        if not all(postings):
+            return {}
+
+        candidates = set(postings[0]).intersection(*postings[1:])
+        matches = {}
+        for doc_id in candidates:
+            following = [set(p[doc_id]) for p in postings[1:]]
+            count = sum(
+                1 for start in postings[0][doc_id]
+                if all(start + offset + 1 in positions for offset, positions in enumerate(following))
+            )
+            if count:
+                matches[doc_id] = count
+        return matches
+
+    def search(self, query):
+        """
+        Ranks assignment IDs matching every clause of the query.
+        Supports bare terms, prefix terms ending in '*' and quoted phrases.
+        """
+        doc_count = len(self.docs)
+        if not doc_count:
+            return []
+        avg_length = self.total_length / doc_count
+
+        results = None
+        for phrase, word in QUERY_PATTERN.findall(query):
+            if phrase:
+                terms = tokenize(phrase)
+                if not terms:
+                    continue
+                matches = self._phrase_matches(terms) if len(terms) > 1 else self._term_matches(terms[0])
+            else:
+                prefix = word.endswith('*')
+                terms = tokenize(word)
+                if not terms:
+                    continue
+                matches = {}
+                for term in terms:
+                    for doc_id, tf in self._term_matches(term + ('*' if prefix else '')).items():
+                        matches[doc_id] = matches.get(doc_id, 0) + tf
+
+            # BM25 scoring, aggregated per assignment
+            idf = math.log(1 + (doc_count - len(matches) + 0.5) / (len(matches) + 0.5))
+            scores = {}
+            for doc_id, tf in matches.items():
+                doc = self.docs[doc_id]
+                norm = tf + 1.2 * (0.25 + 0.75 * doc['length'] / avg_length)
+                score = idf * tf * 2.2 / norm
+                scores[doc['assignment_id']] = scores.get(doc['assignment_id'], 0) + score
+
+            if results is None:
+                results = scores
+            else:
+                results = {
+                    assignment_id: results[assignment_id] + score
+                    for assignment_id, score in scores.items()
+                    if assignment_id in results
+                }
+
+        if not results:
+            return []
+        return sorted(results.items(), key=lambda item: item[1], reverse=True)
+
+    def _snapshot(self):
+        # Position lists are never mutated once written, so copying the two outer levels is enough
+        return {
+            'postings': {term: dict(postings) for term, postings in self.postings.items()},
+            'docs': dict(self.docs),
+            'next_doc_id': self.next_doc_id,
+        }
+
+    def _serialize(self, snapshot):
+        return json.dumps(snapshot)
+
+    def _write_index(self, data):
+        directory = os.path.dirname(SEARCH_INDEX_PATH)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = f"{SEARCH_INDEX_PATH}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, SEARCH_INDEX_PATH)
+
+    @commands.command(name='search')
+    @commands.has_permissions(manage_guild=True)
+    async def search_command(self, ctx, *, query):
+        """
+        Admin command to search revisions, disputes, reviews and transcripts.
+        Usage: !search terms, prefix* or "exact phrase"
+        """
+        started = time.perf_counter()
+        results = self.search(query)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if not results:
+            await ctx.send(f"🔍 No assignments matched `{query}`.")
+            return
+
+        embed = discord.Embed(title=f"Search results for: {query}", color=discord.Color.blue())
+        for rank, (assignment_id, score) in enumerate(results[:SEARCH_RESULT_LIMIT], start=1):
+            embed.add_field(name=f"{rank}. Assignment {assignment_id}", value=f"Score: {score:.2f}", inline=False)
+        embed.set_footer(text=f"{len(results)} matches in {elapsed_ms:.1f} ms")
+        await ctx.send(embed=embed)
+
+    @tasks.loop(minutes=1)
+    async def save_index(self):
+        """Task that persists the index to disk when it has changed."""
+        if not self.dirty:
+            return
+        self.dirty = False
+        try:
+            snapshot = self._snapshot()
+            await asyncio.to_thread(lambda: self._write_index(self._serialize(snapshot)))
+        except OSError:
+            self.dirty = True
+            logging.error('Failed to save the search index.', exc_info=True)
+
+async def setup(bot):
+    await bot.add_cog(Search(bot))
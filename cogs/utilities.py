@@ -2,6 +2,10 @@
 
 import uuid
 import re
+import io
+import random
+import zipfile
+import zlib
 import config
 import requests
 from urllib.parse import urlencode
@@ -25,6 +29,20 @@ def validate_input(input_str, pattern):
     """
     return re.match(pattern, input_str)
 
+async def notify_admins(bot, message, urgent=False):
+    """
+    Sends a notification to every admin, through the Communication cog's digests when it is loaded.
+    """
+    communication_cog = bot.get_cog('Communication')
+    if communication_cog:
+        await communication_cog.notify_admins(message, urgent=urgent)
+        return
+
+    for admin_id in config.ADMIN_IDS:
+        admin_user = bot.get_user(admin_id)
+        if admin_user:
+            await admin_user.send(message)
+
 def create_payment_links(payment_id, amount):
     """
     Generates secure payment links for PayPal and Stripe.
@@ -87,3 +105,68 @@ def create_stripe_checkout_session(payment_id, amount):
     except Exception as e:
         print(f"Error creating Stripe Checkout Session: {e}")
         return None
+
+# ---------------------------
+# Near-duplicate detection helpers
+# ---------------------------
+
+MINHASH_PERMUTATIONS = 128
+MINHASH_PRIME = (1 << 61) - 1
+SHINGLE_SIZE = 5  # Words per shingle
+
+_minhash_rng = random.Random(4242)  # Fixed seed so every worker process hashes identically
+MINHASH_COEFFICIENTS = [
+    (_minhash_rng.randrange(1, MINHASH_PRIME), _minhash_rng.randrange(0, MINHASH_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+TEXT_EXTENSIONS = ('.txt', '.md', '.csv', '.rtf', '.html', '.tex')
+
+def extract_text(filename, data):
+    """
+    Extracts plain text from an attachment's bytes. Returns an empty string for unsupported types.
+    """
+    name = filename.lower()
+    if name.endswith(TEXT_EXTENSIONS):
+        return data.decode('utf-8', errors='ignore')
+    if name.endswith('.docx'):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as docx:
+                xml = docx.read('word/document.xml').decode('utf-8', errors='ignore')
+        except (zipfile.BadZipFile, KeyError):
+            return ''
+        return re.sub(r'<[^>]+>', ' ', xml)
+    return ''
+
+def shingle(text, size=SHINGLE_SIZE):
+    """
+    Splits text into a set of hashed word shingles.
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) < size:
+        return set()
+    return {
+        zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+        for i in range(len(words) - size + 1)
+    }
+
+def minhash_signature(shingles):
+    """
+    Computes a MinHash signature for a set of hashed shingles.
+    """
+    return [
+        min((a * s + b) % MINHASH_PRIME for s in shingles)
+        for a, b in MINHASH_COEFFICIENTS
+    ]
+
+def compute_submission_signature(content, attachments):
+    """
+    Extracts, shingles and MinHashes a message and its attachments.
+    Runs in a worker process; attachments is a list of (filename, bytes) tuples.
+    Returns None when there is too little text to compare.
+    """
+    text = '\n'.join([content] + [extract_text(filename, data) for filename, data in attachments])
+    shingles = shingle(text)
+    if len(shingles) < 10:
+        return None
+    return minhash_signature(shingles)